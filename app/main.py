@@ -1,15 +1,35 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.concurrency import run_in_threadpool
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+import orjson
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 
 from app.config import settings
+from app.middleware import StaticCORSMiddleware
 from app.schemas import ChatRequest, ChatResponse
-from app.services.llm import get_chat_service
+from app.services.llm import GeminiChatService
+from app.tools import HospitalAPIClient
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Build shared services on startup and release their resources on shutdown."""
+    hospital_client = HospitalAPIClient()
+    app.state.hospital_client = hospital_client
+    app.state.chat_service = GeminiChatService(hospital_client)
+    await hospital_client.start()
+    try:
+        yield
+    finally:
+        await hospital_client.aclose()
+
 
 app = FastAPI(
     title="Hospital Assistant Chatbot",
     description="Conversational receptionist assistant backed by Gemini and LangChain.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Allow the Lovable frontend to call the API.
@@ -20,13 +40,12 @@ origins = [
     "https://lovable.dev/projects/cfbe1d2e-36a0-4b53-96e5-deefa67b8c41",
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app.add_middleware(StaticCORSMiddleware, allow_origins=origins)
+
+
+async def get_chat_service(request: Request) -> GeminiChatService:
+    """Resolve the chat service built during application startup."""
+    return request.app.state.chat_service
 
 
 @app.get("/health")
@@ -36,11 +55,13 @@ async def health_check() -> dict[str, str]:
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest) -> ChatResponse:
+async def chat_endpoint(
+    request: ChatRequest,
+    chat_service: GeminiChatService = Depends(get_chat_service),
+) -> ChatResponse:
     """Accept a user message and return the assistant reply."""
     try:
-        reply = await run_in_threadpool(
-            get_chat_service().generate_reply,
+        reply = await chat_service.generate_reply(
             request.user_message,
             request.history,
             request.conversation_id,
@@ -51,4 +72,31 @@ async def chat_endpoint(request: ChatRequest) -> ChatResponse:
         raise HTTPException(
             status_code=500, detail="Failed to generate reply."
         ) from exc
-    return ChatResponse(reply=reply)
+    return ChatResponse.model_construct(reply=reply)
+
+
+def _format_sse(event: Dict[str, Any]) -> bytes:
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(
+    request: ChatRequest,
+    chat_service: GeminiChatService = Depends(get_chat_service),
+) -> StreamingResponse:
+    """Stream the assistant reply as server-sent events."""
+
+    async def event_stream() -> AsyncIterator[bytes]:
+        try:
+            async for event in chat_service.stream_reply(
+                request.user_message,
+                request.history,
+                request.conversation_id,
+            ):
+                yield _format_sse(event)
+        except RuntimeError as exc:
+            yield _format_sse({"type": "error", "detail": str(exc)})
+        except Exception:  # pragma: no cover - defensive fallback
+            yield _format_sse({"type": "error", "detail": "Failed to generate reply."})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
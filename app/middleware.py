@@ -0,0 +1,101 @@
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+_ALLOWED_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+_PREFLIGHT_MAX_AGE = b"600"
+_VARY_ORIGIN = (b"vary", b"Origin")
+
+
+class StaticCORSMiddleware:
+    """CORS for a fixed set of exact origins with precomputed response headers.
+
+    Behaves like Starlette's ``CORSMiddleware`` with credentials allowed and
+    wildcard methods and headers.
+    """
+
+    def __init__(self, app: ASGIApp, allow_origins: Iterable[str]) -> None:
+        self.app = app
+        self._allow_origins = frozenset(
+            origin.encode("latin-1") for origin in allow_origins
+        )
+        self._simple_headers: List[Tuple[bytes, bytes]] = [
+            (b"access-control-allow-credentials", b"true"),
+            _VARY_ORIGIN,
+        ]
+        self._preflight_headers: List[Tuple[bytes, bytes]] = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-allow-methods", _ALLOWED_METHODS),
+            (b"access-control-max-age", _PREFLIGHT_MAX_AGE),
+            _VARY_ORIGIN,
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin: Optional[bytes] = None
+        request_method: Optional[bytes] = None
+        request_headers: Optional[bytes] = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        # Responses differ by Origin, so shared caches must key on it even when
+        # no CORS headers are added.
+        async def send_with_vary(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), _VARY_ORIGIN]
+            await send(message)
+
+        if origin is None:
+            await self.app(scope, receive, send_with_vary)
+            return
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight_response(origin, request_headers, send)
+            return
+
+        if origin not in self._allow_origins:
+            await self.app(scope, receive, send_with_vary)
+            return
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"access-control-allow-origin", origin),
+                    *self._simple_headers,
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def _preflight_response(
+        self, origin: bytes, request_headers: Optional[bytes], send: Send
+    ) -> None:
+        if origin not in self._allow_origins:
+            body = b"Disallowed CORS origin"
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 400,
+                    "headers": [
+                        (b"content-type", b"text/plain; charset=utf-8"),
+                        (b"content-length", str(len(body)).encode("latin-1")),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        headers = [(b"access-control-allow-origin", origin), *self._preflight_headers]
+        if request_headers:
+            headers.append((b"access-control-allow-headers", request_headers))
+        await send({"type": "http.response.start", "status": 204, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
@@ -1,11 +1,17 @@
 from typing import Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Pins pydantic v2's defaults explicitly: unknown fields are dropped and model
+# instances passed as field values are not re-validated.
+_API_MODEL_CONFIG = ConfigDict(extra="ignore", revalidate_instances="never")
 
 
 class Message(BaseModel):
     """Represents a single turn in the chat history."""
 
+    model_config = _API_MODEL_CONFIG
+
     role: Literal["system", "user", "assistant"] = Field(
         ..., description="Role of the speaker for this message."
     )
@@ -15,6 +21,8 @@ class Message(BaseModel):
 class ChatRequest(BaseModel):
     """Incoming request payload for a chat completion."""
 
+    model_config = _API_MODEL_CONFIG
+
     user_message: str = Field(..., description="New user input that needs a reply.")
     history: list[Message] = Field(
         default_factory=list,
@@ -32,4 +40,6 @@ class ChatRequest(BaseModel):
 class ChatResponse(BaseModel):
     """Response payload corresponding to the chatbot reply."""
 
+    model_config = _API_MODEL_CONFIG
+
     reply: str = Field(..., description="Assistant response.")
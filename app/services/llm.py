@@ -1,21 +1,55 @@
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import Iterable, List, Optional
+import asyncio
+import re
+from collections import deque
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
 from langchain_core.messages import (
     AIMessage,
+    AIMessageChunk,
     BaseMessage,
     HumanMessage,
     SystemMessage,
     ToolMessage,
 )
+from langchain_core.runnables import Runnable
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from app.config import settings
 from app.schemas import Message
-from app.services.memory import ConversationMemory
-from app.tools import get_hospital_tools
+from app.services.memory import ConversationMemory, to_langchain_message
+from app.tools import HospitalAPIClient, get_hospital_tools
+
+
+# Greetings and thanks never need hospital data, so they are answered without
+# sending the tool schemas. Affirmations such as "ok" or "yes" are deliberately
+# absent because they often confirm a pending booking.
+_SMALL_TALK_MAX_LENGTH = 20
+_SMALL_TALK_PATTERN = re.compile(
+    r"(?:hi+|hello|hey|namaste|namaskar|good (?:morning|afternoon|evening)"
+    r"|thanks|thank you|thank u|bye|goodbye|नमस्ते|नमस्कार|धन्यवाद)"
+    r"(?:\s+(?:there|again|so much|a lot))?[\s!.,]*",
+    re.IGNORECASE,
+)
+
+
+def _is_small_talk(user_message: str) -> bool:
+    """Return True for short greetings or thanks that need no tool calls."""
+    cleaned = user_message.strip()
+    return (
+        len(cleaned) < _SMALL_TALK_MAX_LENGTH
+        and _SMALL_TALK_PATTERN.fullmatch(cleaned) is not None
+    )
+
+
+def _text_of_chunk(chunk: object) -> str | None:
+    """Return the text of one content block, or None for non-text blocks."""
+    if isinstance(chunk, str):
+        return chunk
+    if isinstance(chunk, dict) and chunk.get("type") == "text":
+        return chunk.get("text") or None
+    return None
 
 
 class GeminiChatService:
@@ -35,16 +69,15 @@ class GeminiChatService:
     MAX_HISTORY_MESSAGES = 5
     DEFAULT_CONVERSATION_ID = "_default_session"
 
-    def __init__(self) -> None:
+    def __init__(self, hospital_client: HospitalAPIClient) -> None:
         self._llm = ChatGoogleGenerativeAI(
             model=settings.gemini_model,
             google_api_key=settings.require_google_api_key(),
             temperature=settings.llm_temperature,
         )
-        self._tools = get_hospital_tools()
+        self._tools = get_hospital_tools(hospital_client)
         self._tool_map = {tool.name: tool for tool in self._tools}
         self._llm_with_tools = self._llm.bind_tools(self._tools)
-        self._system_message = SystemMessage(content=self.SYSTEM_PROMPT)
         self._max_tool_iterations = 3
         self._memory = ConversationMemory(self.MAX_HISTORY_MESSAGES)
 
@@ -52,11 +85,10 @@ class GeminiChatService:
         """Convert API message schema into LangChain message objects."""
         mapped: List[BaseMessage] = []
         for item in history:
-            if item.role == "user":
-                mapped.append(HumanMessage(content=item.content))
-            elif item.role == "assistant":
-                mapped.append(AIMessage(content=item.content))
+            lc_message = to_langchain_message(item.role, item.content)
             # Ignore external system messages to avoid conflicts.
+            if lc_message is not None:
+                mapped.append(lc_message)
         return mapped
 
     @staticmethod
@@ -66,17 +98,12 @@ class GeminiChatService:
         if isinstance(content, str):
             return content
         if isinstance(content, list):
-            parts: List[str] = []
-            for chunk in content:
-                if isinstance(chunk, dict):
-                    if chunk.get("type") == "text" and chunk.get("text"):
-                        parts.append(chunk["text"])
-                elif isinstance(chunk, str):
-                    parts.append(chunk)
-            return "\n".join(parts)
+            return "\n".join(
+                text for text in map(_text_of_chunk, content) if text is not None
+            )
         return str(content)
 
-    def _call_tool(
+    async def _call_tool(
         self, tool_name: str, tool_args: dict, tool_call_id: str | None
     ) -> ToolMessage:
         tool = self._tool_map.get(tool_name)
@@ -87,7 +114,7 @@ class GeminiChatService:
                 tool_call_id=tool_call_id,
             )
         try:
-            result = tool.invoke(tool_args or {})
+            result = await tool.ainvoke(tool_args or {})
         except Exception as exc:  # pragma: no cover - defensive
             result = f"Tool '{tool_name}' failed: {exc}"
         return ToolMessage(
@@ -96,13 +123,30 @@ class GeminiChatService:
             tool_call_id=tool_call_id,
         )
 
-    def generate_reply(
+    def _select_model(self, user_message: str) -> Runnable:
+        """Skip the tool schemas for small talk; bind tools for everything else."""
+        if _is_small_talk(user_message):
+            return self._llm
+        return self._llm_with_tools
+
+    async def _run_tool_calls(self, tool_calls: List[dict]) -> List[ToolMessage]:
+        """Execute every tool call requested in one model turn concurrently."""
+        return await asyncio.gather(
+            *[
+                self._call_tool(
+                    call.get("name"), call.get("args") or {}, call.get("id")
+                )
+                for call in tool_calls
+            ]
+        )
+
+    def _prepare_conversation(
         self,
         user_message: str,
         history: Iterable[Message],
-        conversation_id: Optional[str] = None,
-    ) -> str:
-        """Generate a response from Gemini given the prior conversation."""
+        conversation_id: Optional[str],
+    ) -> Tuple[Optional[str], List[BaseMessage]]:
+        """Resolve the memory key and build the prompt for a new user turn."""
         effective_id: Optional[str]
         if conversation_id:
             effective_id = conversation_id
@@ -114,51 +158,113 @@ class GeminiChatService:
         if effective_id:
             if history:
                 self._memory.set_history(effective_id, history)
-            history_source = self._memory.get_history(effective_id)
+            lc_history = self._memory.get_history_lc(effective_id)
         else:
-            history_source = list(history)
+            # A bounded deque keeps the most recent turns in one pass.
+            trimmed_history = deque(history, maxlen=self.MAX_HISTORY_MESSAGES)
+            lc_history = self._map_history(trimmed_history)
+        conversation: List[BaseMessage] = [_SYSTEM_MESSAGE]
+        conversation += lc_history
+        conversation.append(HumanMessage.model_construct(content=user_message))
+        return effective_id, conversation
 
-        trimmed_history = history_source[-self.MAX_HISTORY_MESSAGES :]
-        lc_history = self._map_history(trimmed_history)
-        conversation: List[BaseMessage] = [
-            self._system_message,
-            *lc_history,
-            HumanMessage(content=user_message),
-        ]
+    def _remember(
+        self, effective_id: Optional[str], user_message: str, reply_text: str
+    ) -> None:
+        if effective_id:
+            self._memory.append_messages(
+                effective_id,
+                [("user", user_message), ("assistant", reply_text)],
+            )
 
+    async def generate_reply(
+        self,
+        user_message: str,
+        history: Iterable[Message],
+        conversation_id: Optional[str] = None,
+    ) -> str:
+        """Generate a response from Gemini given the prior conversation."""
+        effective_id, conversation = self._prepare_conversation(
+            user_message, history, conversation_id
+        )
+
+        model = self._select_model(user_message)
         reply_text: Optional[str] = None
         for _ in range(self._max_tool_iterations):
-            response = self._llm_with_tools.invoke(conversation)
+            response = await model.ainvoke(conversation)
             conversation.append(response)
             tool_calls = getattr(response, "tool_calls", None) or []
             if not tool_calls:
                 reply_text = self._stringify_content(response)
                 break
 
-            for call in tool_calls:
-                tool_name = call.get("name")
-                tool_args = call.get("args") or {}
-                tool_call_id = call.get("id")
-                tool_message = self._call_tool(tool_name, tool_args, tool_call_id)
-                conversation.append(tool_message)
+            conversation.extend(await self._run_tool_calls(tool_calls))
 
         if reply_text is None:
-            final_response = self._llm.invoke(conversation)
+            final_response = await self._llm.ainvoke(conversation)
             reply_text = self._stringify_content(final_response)
 
-        if effective_id:
-            self._memory.append_messages(
-                effective_id,
-                [
-                    Message(role="user", content=user_message),
-                    Message(role="assistant", content=reply_text),
-                ],
-            )
-
+        self._remember(effective_id, user_message, reply_text)
         return reply_text
 
+    async def stream_reply(
+        self,
+        user_message: str,
+        history: Iterable[Message],
+        conversation_id: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a response as events while running any requested tools.
+
+        Yields ``token`` events with text deltas, a ``tool_calls`` event whenever
+        the model pauses to call hospital tools, and a final ``done`` event
+        carrying the complete reply, which is also written to memory. If a turn
+        that already streamed text ends in tool calls, a ``reset`` event precedes
+        ``tool_calls`` so the client discards that preliminary text.
+        """
+        effective_id, conversation = self._prepare_conversation(
+            user_message, history, conversation_id
+        )
+
+        model = self._select_model(user_message)
+        reply_parts: List[str] = []
+        for _ in range(self._max_tool_iterations):
+            reply_parts = []
+            response: Optional[AIMessageChunk] = None
+            async for chunk in model.astream(conversation):
+                response = chunk if response is None else response + chunk
+                text = self._stringify_content(chunk)
+                if text:
+                    reply_parts.append(text)
+                    yield {"type": "token", "text": text}
+            if response is None:
+                break
+            conversation.append(response)
+            tool_calls = response.tool_calls
+            if not tool_calls:
+                break
+
+            if reply_parts:
+                yield {"type": "reset"}
+            yield {
+                "type": "tool_calls",
+                "tools": [call.get("name") for call in tool_calls],
+            }
+            conversation.extend(await self._run_tool_calls(tool_calls))
+        else:
+            reply_parts = []
+            async for chunk in self._llm.astream(conversation):
+                text = self._stringify_content(chunk)
+                if text:
+                    reply_parts.append(text)
+                    yield {"type": "token", "text": text}
 
-@lru_cache
-def get_chat_service() -> GeminiChatService:
-    """Return a singleton GeminiChatService instance."""
-    return GeminiChatService()
+        reply_text = "".join(reply_parts)
+        self._remember(effective_id, user_message, reply_text)
+        yield {"type": "done", "reply": reply_text}
+
+
+# The prompt is a trusted constant, so one unvalidated instance is shared by
+# every conversation.
+_SYSTEM_MESSAGE = SystemMessage.model_construct(
+    content=GeminiChatService.SYSTEM_PROMPT
+)
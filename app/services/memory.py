@@ -1,43 +1,88 @@
 from __future__ import annotations
 
 from collections import deque
-from threading import Lock
-from typing import Deque, Dict, Iterable, List
+from dataclasses import dataclass, field
+from typing import Deque, Iterable, List, Optional
+
+from cachetools import LRUCache
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 
 from app.schemas import Message
 
+_LC_MESSAGE_TYPES = {"user": HumanMessage, "assistant": AIMessage}
+
+
+def to_langchain_message(role: str, content: str) -> Optional[BaseMessage]:
+    """Build the LangChain message for a trusted turn, skipping validation.
+
+    System messages yield ``None`` so external prompts never override ours.
+    """
+    message_type = _LC_MESSAGE_TYPES.get(role)
+    if message_type is None:
+        return None
+    return message_type.model_construct(content=content)
+
+
+@dataclass(frozen=True, slots=True)
+class StoredMessage:
+    """Lightweight chat turn kept in memory without Pydantic validation."""
+
+    role: str
+    content: str
+    lc_message: Optional[BaseMessage] = field(
+        default=None, compare=False, repr=False
+    )
+
+    @classmethod
+    def build(cls, role: str, content: str) -> StoredMessage:
+        return cls(role, content, to_langchain_message(role, content))
+
 
 class ConversationMemory:
-    """Thread-safe in-memory store that keeps the most recent chat messages."""
+    """In-memory store that keeps the most recent chat messages.
+
+    The store is only touched from the event loop and no method awaits, so
+    each call runs to completion without a lock. Replacing a history is a
+    single assignment, and deque appends are atomic. At most
+    ``max_conversations`` histories are kept; the least recently used one is
+    evicted first so arbitrary client-supplied IDs cannot grow memory forever.
+    """
 
-    def __init__(self, max_messages: int) -> None:
+    DEFAULT_MAX_CONVERSATIONS = 10_000
+
+    def __init__(
+        self, max_messages: int, max_conversations: int = DEFAULT_MAX_CONVERSATIONS
+    ) -> None:
         self._max_messages = max_messages
-        self._store: Dict[str, Deque[Message]] = {}
-        self._lock = Lock()
+        self._store: LRUCache[str, Deque[StoredMessage]] = LRUCache(
+            maxsize=max_conversations
+        )
+
+    def get_history_lc(self, conversation_id: str) -> List[BaseMessage]:
+        """Return the stored turns as prebuilt LangChain messages.
 
-    def get_history(self, conversation_id: str) -> List[Message]:
-        with self._lock:
-            if conversation_id not in self._store:
-                return []
-            return list(self._store[conversation_id])
+        Each deque is already capped at ``max_messages``, so no trimming is needed.
+        """
+        history = self._store.get(conversation_id)
+        if not history:
+            return []
+        return [
+            message.lc_message for message in history if message.lc_message is not None
+        ]
 
     def set_history(self, conversation_id: str, messages: Iterable[Message]) -> None:
-        with self._lock:
-            limited = deque(maxlen=self._max_messages)
-            for message in messages:
-                limited.append(message)
-            self._store[conversation_id] = limited
+        self._store[conversation_id] = deque(
+            (StoredMessage.build(item.role, item.content) for item in messages),
+            maxlen=self._max_messages,
+        )
 
     def append_messages(
-        self, conversation_id: str, messages: Iterable[Message]
+        self, conversation_id: str, messages: Iterable[tuple[str, str]]
     ) -> None:
-        with self._lock:
-            history = self._store.setdefault(
-                conversation_id, deque(maxlen=self._max_messages)
-            )
-            for message in messages:
-                history.append(message)
+        history = self._store.get(conversation_id)
+        if history is None:
+            history = self._store[conversation_id] = deque(maxlen=self._max_messages)
+        history.extend(StoredMessage.build(role, content) for role, content in messages)
 
     def clear(self, conversation_id: str) -> None:
-        with self._lock:
-            self._store.pop(conversation_id, None)
+        self._store.pop(conversation_id, None)
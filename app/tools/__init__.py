@@ -1,3 +1,3 @@
-from app.tools.hospital_api import get_hospital_tools
+from app.tools.hospital_api import HospitalAPIClient, get_hospital_tools
 
-__all__ = ["get_hospital_tools"]
+__all__ = ["HospitalAPIClient", "get_hospital_tools"]
@@ -1,8 +1,13 @@
-import json
+import asyncio
+import math
 from difflib import get_close_matches
-from typing import Any, Dict, List, Optional
+from functools import lru_cache, partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
 
+import ahocorasick
 import httpx
+import orjson
+from cachetools import TTLCache
 from langchain_core.tools import StructuredTool
 from pydantic import BaseModel, Field
 
@@ -12,12 +17,54 @@ from app.config import settings
 class HospitalAPIClient:
     """Thin wrapper around the hospital backend REST API."""
 
+    CACHE_MAX_ENTRIES = 512
+    CACHE_TTL_SECONDS = 120
+
     def __init__(self) -> None:
         self._base_url = settings.hospital_api_base_url.rstrip("/")
         self._timeout = settings.http_timeout_seconds
         self._default_headers = {"accept": "application/json"}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache: TTLCache = TTLCache(
+            maxsize=self.CACHE_MAX_ENTRIES, ttl=self.CACHE_TTL_SECONDS
+        )
+        # Formatted tool output, so repeated calls in one tool loop skip both the
+        # HTTP round-trip and the reformatting.
+        self._output_cache: TTLCache = TTLCache(
+            maxsize=self.CACHE_MAX_ENTRIES, ttl=self.CACHE_TTL_SECONDS
+        )
+        self._inflight: Dict[Tuple[Hashable, ...], asyncio.Lock] = {}
+        # Bumped on every invalidation so reads that were in flight at the time
+        # do not repopulate the cache with pre-invalidation data.
+        self._cache_generation = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                base_url=self._base_url,
+                timeout=self._timeout,
+                headers=self._default_headers,
+                limits=httpx.Limits(
+                    max_connections=100,
+                    max_keepalive_connections=50,
+                    keepalive_expiry=30.0,
+                ),
+            )
+        return self._client
 
-    def _request(
+    async def start(self) -> None:
+        """Open the shared connection pool ahead of the first request."""
+        self._get_client()
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(
         self,
         method: str,
         path: str,
@@ -26,21 +73,20 @@ class HospitalAPIClient:
         json_body: Optional[Dict[str, Any]] = None,
         headers: Optional[Dict[str, str]] = None,
     ) -> Dict[str, Any]:
-        url = f"{self._base_url}/{path.lstrip('/')}"
-        merged_headers = {**self._default_headers, **(headers or {})}
+        relative_path = path.lstrip("/")
+        url = f"{self._base_url}/{relative_path}"
         try:
-            with httpx.Client(timeout=self._timeout) as client:
-                response = client.request(
-                    method,
-                    url,
-                    params=params,
-                    json=json_body,
-                    headers=merged_headers,
-                )
-                response.raise_for_status()
-                if response.content:
-                    return response.json()
-                return {}
+            response = await self._get_client().request(
+                method,
+                relative_path,
+                params=params,
+                content=orjson.dumps(json_body) if json_body is not None else None,
+                headers=headers,
+            )
+            response.raise_for_status()
+            if response.content:
+                return orjson.loads(response.content)
+            return {}
         except httpx.HTTPStatusError as exc:
             raise RuntimeError(
                 f"Hospital API error {exc.response.status_code} for {url}: "
@@ -49,38 +95,99 @@ class HospitalAPIClient:
         except httpx.HTTPError as exc:
             raise RuntimeError(f"Hospital API request failed for {url}: {exc}") from exc
 
-    def search_doctors(
+    async def _cached_request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json_body: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """Serve read-only calls from a short-lived cache.
+
+        Concurrent identical calls share a single upstream request.
+        """
+        key = (
+            method,
+            path,
+            frozenset((params or {}).items()),
+            orjson.dumps(json_body, option=orjson.OPT_SORT_KEYS),
+        )
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        lock = self._inflight.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+            generation = self._cache_generation
+            try:
+                result = await self._request(
+                    method, path, params=params, json_body=json_body, headers=headers
+                )
+            finally:
+                if self._inflight.get(key) is lock:
+                    del self._inflight[key]
+            if generation == self._cache_generation:
+                self._cache[key] = result
+            return result
+
+    async def cached_output(
+        self, key: Tuple[Hashable, ...], produce: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Return cached formatted tool output, producing it on a miss."""
+        cached = self._output_cache.get(key)
+        if cached is not None:
+            return cached
+        generation = self._cache_generation
+        output = await produce()
+        if generation == self._cache_generation:
+            self._output_cache[key] = output
+        return output
+
+    def invalidate_cache(self) -> None:
+        """Drop cached responses, e.g. after a booking changes availability."""
+        self._cache_generation += 1
+        self._cache.clear()
+        self._output_cache.clear()
+
+    async def search_doctors(
         self, query: str, city: Optional[str], ai_mode: bool
     ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {"query": query, "ai_mode": ai_mode}
         if city:
             payload["city"] = city
-        return self._request(
+        return await self._cached_request(
             "POST",
             "/patient/search-doctor",
             json_body=payload,
             headers={"Content-Type": "application/json"},
         )
 
-    def book_appointment(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        return self._request(
+    async def book_appointment(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = await self._request(
             "POST",
             "/patient/book-appointment",
             json_body=payload,
             headers={"Content-Type": "application/json"},
         )
+        self.invalidate_cache()
+        return response
 
-    def doctor_availability_week(self, doctor_id: str) -> Dict[str, Any]:
-        return self._request(
+    async def doctor_availability_week(self, doctor_id: str) -> Dict[str, Any]:
+        return await self._cached_request(
             "GET",
             f"/doctor/availability/week/{doctor_id}",
         )
 
-    def appointments_by_phone(
+    async def appointments_by_phone(
         self, phone_number: str, page: int, limit: int
     ) -> Dict[str, Any]:
         safe_limit = max(1, min(limit, 50))
-        return self._request(
+        return await self._cached_request(
             "GET",
             "/patient/appointments-by-phone",
             params={
@@ -91,9 +198,6 @@ class HospitalAPIClient:
         )
 
 
-_hospital_client = HospitalAPIClient()
-
-
 SPECIALTY_SYNONYMS: Dict[str, List[str]] = {
     "Cardiologist": [
         "cardiologist",
@@ -141,40 +245,85 @@ SPECIALTY_SYNONYMS: Dict[str, List[str]] = {
 ALIAS_TO_SPECIALTY: Dict[str, str] = {}
 for canonical, aliases in SPECIALTY_SYNONYMS.items():
     for alias in aliases:
-        ALIAS_TO_SPECIALTY[alias.lower()] = canonical
+        ALIAS_TO_SPECIALTY[alias.casefold()] = canonical
+_ALIAS_KEYS = tuple(ALIAS_TO_SPECIALTY)
+# Queries shorter than this only get an exact alias lookup; substring and fuzzy
+# matching are meaningless for two or three characters.
+_MIN_FREE_TEXT_QUERY_LENGTH = 5
+
+# Multi-pattern matcher that finds every alias inside free text in one pass.
+_ALIAS_AUTOMATON = ahocorasick.Automaton()
+for alias, canonical in ALIAS_TO_SPECIALTY.items():
+    _ALIAS_AUTOMATON.add_word(alias, (len(alias), canonical))
+_ALIAS_AUTOMATON.make_automaton()
 
 
 def _format_json(payload: Dict[str, Any]) -> str:
     if not payload:
         return "No data returned."
-    return json.dumps(payload, indent=2, ensure_ascii=True)
+    return orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode()
 
 
+@lru_cache(maxsize=2048)
 def normalize_specialty_query(raw_query: str) -> str:
     """Map free-text specialty queries to canonical backend-friendly terms."""
     if not raw_query:
         return raw_query
 
-    cleaned = raw_query.strip().lower()
+    cleaned = raw_query.strip().casefold()
     if not cleaned:
         return raw_query
 
-    if cleaned in ALIAS_TO_SPECIALTY:
-        return ALIAS_TO_SPECIALTY[cleaned]
+    if len(cleaned) < _MIN_FREE_TEXT_QUERY_LENGTH:
+        return ALIAS_TO_SPECIALTY.get(cleaned, raw_query)
 
-    close_match = get_close_matches(
-        cleaned, ALIAS_TO_SPECIALTY.keys(), n=1, cutoff=0.75
-    )
+    canonical = ALIAS_TO_SPECIALTY.get(cleaned)
+    if canonical is not None:
+        return canonical
+
+    # Prefer the longest alias mentioned anywhere in the query.
+    longest: Optional[tuple[int, str]] = None
+    for _, match in _ALIAS_AUTOMATON.iter(cleaned):
+        if longest is None or match[0] > longest[0]:
+            longest = match
+    if longest is not None:
+        return longest[1]
+
+    close_match = get_close_matches(cleaned, _ALIAS_KEYS, n=1, cutoff=0.75)
     if close_match:
         return ALIAS_TO_SPECIALTY[close_match[0]]
 
-    for alias, canonical in ALIAS_TO_SPECIALTY.items():
-        if alias in cleaned:
-            return canonical
-
     return raw_query
 
 
+_DOCTOR_LINE_FMT = (
+    "- {name} ({spec}) at {hosp}, {loc}. Phone: {phone}. Doctor ID: {did}. "
+    "{fee_text}."
+)
+
+
+def _format_doctor_line(
+    doctor: Dict[str, Any], normalized_query: str, city_label: str
+) -> str:
+    fee = doctor.get("consultation_fee")
+    try:
+        fee_value = float(fee)
+        if not math.isfinite(fee_value):
+            raise ValueError(fee)
+        fee_text = f"Fee: INR {fee_value:.0f}"
+    except (TypeError, ValueError):
+        fee_text = "Fee not listed"
+    return _DOCTOR_LINE_FMT.format(
+        name=doctor.get("full_name", "Unknown doctor"),
+        spec=doctor.get("specialization", normalized_query),
+        hosp=doctor.get("hospital_name", "Unknown hospital"),
+        loc=doctor.get("hospital_address") or doctor.get("location") or city_label,
+        phone=doctor.get("phone", "Phone not listed"),
+        did=doctor.get("doctor_id", "ID unavailable"),
+        fee_text=fee_text,
+    )
+
+
 def _format_doctor_search_response(
     response: Dict[str, Any],
     normalized_query: str,
@@ -195,25 +344,10 @@ def _format_doctor_search_response(
         lines.append(
             f"Found {len(doctors)} doctor(s) for {normalized_query} in {city_label}."
         )
-        for doctor in doctors[:5]:
-            name = doctor.get("full_name", "Unknown doctor")
-            specialization = doctor.get("specialization", normalized_query)
-            hospital = doctor.get("hospital_name", "Unknown hospital")
-            location = (
-                doctor.get("hospital_address") or doctor.get("location") or city_label
-            )
-            phone = doctor.get("phone", "Phone not listed")
-            doctor_id = doctor.get("doctor_id", "ID unavailable")
-            fee = doctor.get("consultation_fee")
-            fee_text = (
-                f"Fee: INR {fee:.0f}"
-                if isinstance(fee, (int, float))
-                else "Fee not listed"
-            )
-            lines.append(
-                f"- {name} ({specialization}) at {hospital}, {location}. "
-                f"Phone: {phone}. Doctor ID: {doctor_id}. {fee_text}."
-            )
+        lines.extend(
+            _format_doctor_line(doctor, normalized_query, city_label)
+            for doctor in doctors[:5]
+        )
         if len(doctors) > 5:
             lines.append(
                 f"There are {len(doctors) - 5} more doctor(s) available. "
@@ -221,8 +355,7 @@ def _format_doctor_search_response(
             )
         if suggestions:
             lines.append("General care tips:")
-            for tip in suggestions[:3]:
-                lines.append(f"* {tip}")
+            lines.extend(f"* {tip}" for tip in suggestions[:3])
     else:
         city_label = city or "the requested area"
         fallback = message or "No matching doctors returned by the search API."
@@ -237,6 +370,56 @@ def _format_doctor_search_response(
     return "\n".join(lines)
 
 
+# Candidate keys per appointment field, in priority order: keys on the
+# appointment itself first, then keys on its nested ``doctor`` object.
+_APPOINTMENT_ID_KEYS = (("appointment_id", "id"), ())
+_APPOINTMENT_DOCTOR_NAME_KEYS = (("doctor_name",), ("full_name", "name"))
+_APPOINTMENT_DOCTOR_ID_KEYS = (("doctor_id",), ("doctor_id", "id"))
+_APPOINTMENT_TIME_KEYS = (("meeting_time", "appointment_time", "scheduled_time"), ())
+_APPOINTMENT_TYPE_KEYS = (("appointment_type", "type"), ())
+_APPOINTMENT_LOCATION_KEYS = (("location", "city"), ("hospital_name", "location"))
+
+
+def _first(
+    appointment: Dict[str, Any],
+    doctor: Dict[str, Any],
+    keys: Tuple[Tuple[str, ...], Tuple[str, ...]],
+) -> Any:
+    """Return the first truthy value found under keys, or None."""
+    appointment_keys, doctor_keys = keys
+    value = next(filter(None, map(appointment.get, appointment_keys)), None)
+    if value is None:
+        value = next(filter(None, map(doctor.get, doctor_keys)), None)
+    return value
+
+
+def _format_appointment_line(appointment: Dict[str, Any]) -> str:
+    doctor = appointment.get("doctor") or {}
+    appointment_id = (
+        _first(appointment, doctor, _APPOINTMENT_ID_KEYS) or "Unknown appointment ID"
+    )
+    meeting_time = (
+        _first(appointment, doctor, _APPOINTMENT_TIME_KEYS) or "Unknown time"
+    )
+    status = appointment.get("status", "status unavailable")
+    doctor_name = _first(appointment, doctor, _APPOINTMENT_DOCTOR_NAME_KEYS)
+    appointment_type = _first(appointment, doctor, _APPOINTMENT_TYPE_KEYS)
+    location = _first(appointment, doctor, _APPOINTMENT_LOCATION_KEYS)
+
+    line = f"- Appointment {appointment_id}"
+    if doctor_name:
+        line += f" with {doctor_name}"
+        doctor_id = _first(appointment, doctor, _APPOINTMENT_DOCTOR_ID_KEYS)
+        if doctor_id:
+            line += f" (Doctor ID: {doctor_id})"
+    line += f" on {meeting_time}. Status: {status}."
+    if appointment_type:
+        line += f" Type: {appointment_type}."
+    if location:
+        line += f" Location: {location}."
+    return line
+
+
 def _format_appointments_response(
     response: Any, phone_number: str, page: int, limit: int
 ) -> str:
@@ -268,55 +451,9 @@ def _format_appointments_response(
     lines.append(
         f"Found {len(appointments)} appointment(s) linked to {phone_number} (page {page}, limit {limit})."
     )
-    for appointment in appointments[:5]:
-        appointment_id = (
-            appointment.get("appointment_id")
-            or appointment.get("id")
-            or "Unknown appointment ID"
-        )
-        doctor = appointment.get("doctor") or {}
-        doctor_name = (
-            appointment.get("doctor_name")
-            or doctor.get("full_name")
-            or doctor.get("name")
-            or "Unknown doctor"
-        )
-        doctor_id = (
-            appointment.get("doctor_id")
-            or doctor.get("doctor_id")
-            or doctor.get("id")
-            or "Unknown doctor ID"
-        )
-        meeting_time = (
-            appointment.get("meeting_time")
-            or appointment.get("appointment_time")
-            or appointment.get("scheduled_time")
-            or "Unknown time"
-        )
-        status = appointment.get("status", "status unavailable")
-        appointment_type = appointment.get("appointment_type") or appointment.get(
-            "type", "type unavailable"
-        )
-        location = (
-            appointment.get("location")
-            or appointment.get("city")
-            or doctor.get("hospital_name")
-            or doctor.get("location")
-            or "Location not provided"
-        )
-        line_parts: List[str] = [f"- Appointment {appointment_id}"]
-        if doctor_name != "Unknown doctor":
-            doctor_fragment = f" with {doctor_name}"
-            if doctor_id != "Unknown doctor ID":
-                doctor_fragment += f" (Doctor ID: {doctor_id})"
-            line_parts.append(doctor_fragment)
-        line_parts.append(f" on {meeting_time}.")
-        line_parts.append(f" Status: {status}.")
-        if appointment_type and appointment_type != "type unavailable":
-            line_parts.append(f" Type: {appointment_type}.")
-        if location and location != "Location not provided":
-            line_parts.append(f" Location: {location}.")
-        lines.append("".join(line_parts))
+    lines.extend(
+        _format_appointment_line(appointment) for appointment in appointments[:5]
+    )
 
     if len(appointments) > 5:
         lines.append(
@@ -342,30 +479,43 @@ class SearchDoctorInput(BaseModel):
     )
 
 
-def search_doctors_tool(
-    query: str, city: Optional[str] = None, ai_mode: bool = True
+async def search_doctors_tool(
+    client: HospitalAPIClient,
+    query: str,
+    city: Optional[str] = None,
+    ai_mode: bool = True,
 ) -> str:
     """Return a formatted list of doctors that match the search criteria."""
-    normalized_query = normalize_specialty_query(query)
-    response = _hospital_client.search_doctors(
-        query=normalized_query, city=city, ai_mode=ai_mode
-    )
-    return _format_doctor_search_response(
-        response=response,
-        normalized_query=normalized_query,
-        original_query=query,
-        city=city,
-    )
+
+    async def search() -> str:
+        normalized_query = normalize_specialty_query(query)
+        response = await client.search_doctors(
+            query=normalized_query, city=city, ai_mode=ai_mode
+        )
+        return _format_doctor_search_response(
+            response=response,
+            normalized_query=normalized_query,
+            original_query=query,
+            city=city,
+        )
+
+    # Keyed on the raw query: the output echoes it when it was reinterpreted.
+    return await client.cached_output(("search_doctors", query, city, ai_mode), search)
 
 
 class DoctorAvailabilityInput(BaseModel):
     doctor_id: str = Field(..., description="Doctor UUID to fetch weekly availability.")
 
 
-def doctor_availability_tool(doctor_id: str) -> str:
+async def doctor_availability_tool(
+    client: HospitalAPIClient, doctor_id: str
+) -> str:
     """Fetch a doctor's weekly availability calendar."""
-    response = _hospital_client.doctor_availability_week(doctor_id=doctor_id)
-    return _format_json(response)
+
+    async def fetch() -> str:
+        return _format_json(await client.doctor_availability_week(doctor_id=doctor_id))
+
+    return await client.cached_output(("doctor_weekly_availability", doctor_id), fetch)
 
 
 class AppointmentsByPhoneInput(BaseModel):
@@ -379,11 +529,11 @@ class AppointmentsByPhoneInput(BaseModel):
     )
 
 
-def appointments_by_phone_tool(
-    phone_number: str, page: int = 1, limit: int = 10
+async def appointments_by_phone_tool(
+    client: HospitalAPIClient, phone_number: str, page: int = 1, limit: int = 10
 ) -> str:
     """Retrieve appointments associated with a patient's phone number."""
-    response = _hospital_client.appointments_by_phone(
+    response = await client.appointments_by_phone(
         phone_number=phone_number, page=page, limit=limit
     )
     return _format_appointments_response(response, phone_number, page, limit)
@@ -411,7 +561,8 @@ class BookAppointmentInput(BaseModel):
     )
 
 
-def book_appointment_tool(
+async def book_appointment_tool(
+    client: HospitalAPIClient,
     doctor_id: str,
     patient_name: str,
     patient_phone_number: str,
@@ -431,15 +582,15 @@ def book_appointment_tool(
         "appointment_type": appointment_type,
         "status": status,
     }
-    response = _hospital_client.book_appointment(payload=payload)
+    response = await client.book_appointment(payload=payload)
     return _format_json(response)
 
 
-def get_hospital_tools() -> List[StructuredTool]:
-    """Expose the live hospital API endpoints as LangChain tools."""
+def get_hospital_tools(client: HospitalAPIClient) -> List[StructuredTool]:
+    """Expose the live hospital API endpoints as LangChain tools bound to client."""
     return [
         StructuredTool.from_function(
-            func=search_doctors_tool,
+            coroutine=partial(search_doctors_tool, client),
             name="search_doctors",
             description=(
                 "Search for doctors or specialists by name or specialty, optionally "
@@ -448,7 +599,7 @@ def get_hospital_tools() -> List[StructuredTool]:
             args_schema=SearchDoctorInput,
         ),
         StructuredTool.from_function(
-            func=doctor_availability_tool,
+            coroutine=partial(doctor_availability_tool, client),
             name="doctor_weekly_availability",
             description=(
                 "Retrieve a doctor's weekly availability slots using their UUID."
@@ -456,7 +607,7 @@ def get_hospital_tools() -> List[StructuredTool]:
             args_schema=DoctorAvailabilityInput,
         ),
         StructuredTool.from_function(
-            func=appointments_by_phone_tool,
+            coroutine=partial(appointments_by_phone_tool, client),
             name="appointments_by_phone",
             description=(
                 "List appointments for a patient identified by phone number. "
@@ -465,7 +616,7 @@ def get_hospital_tools() -> List[StructuredTool]:
             args_schema=AppointmentsByPhoneInput,
         ),
         StructuredTool.from_function(
-            func=book_appointment_tool,
+            coroutine=partial(book_appointment_tool, client),
             name="book_appointment",
             description=(
                 "Schedule a new appointment for a patient with a doctor. "